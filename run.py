@@ -12,6 +12,7 @@ This script orchestrates the complete workflow:
 """
 
 import argparse
+import logging
 import sys
 import os
 from pathlib import Path
@@ -92,6 +93,8 @@ Examples:
 
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
     if args.setup:
         setup_first_run()
     elif args.update:
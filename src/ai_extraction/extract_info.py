@@ -8,8 +8,159 @@ AI-Enhanced Information Extraction:
 import re
 import json
 import os
-from typing import Dict, Optional
+import hashlib
+import functools
+import threading
+from datetime import datetime
+from email.utils import parseaddr
+from typing import Dict, List, Optional
 import google.generativeai as genai
+from src.config.db_utils import get_connection
+
+# company name patterns, in priority order
+_COMPANY_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"(?:thank you for applying to|your application (?:to|at))\s+([a-z][a-z\s&.-]+?)(?:\s+for|\.|$)",
+    r"(?:at|from|with)\s+([a-z][a-z\s&.-]+?)(?:\s+for|\s+–|\s+-|\s+\||\.|\s+application|$)",
+    r"([a-z][a-z\s&.-]{2,25})\s+(?:application|internship|position|careers|team)",
+    r"application confirmation\s+[–-]\s+([a-z][a-z\s&.-]+)",
+    r"welcome to\s+([a-z][a-z\s&.-]+?)(?:\s|$)",
+    r"([a-z][a-z\s&.-]{3,30})\s+talent\s+team",
+    r"this is to confirm your application to\s+([a-z][a-z\s&.-]+)",
+)]
+
+# position title patterns, in priority order
+_POSITION_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"(?:for the|for our|for a)\s+([a-z][a-z\s-]{5,40}?)(?:\s+position|\s+role|\s+internship|\.|$)",
+    r"([a-z][a-z\s-]+?)\s+(?:internship|intern)\s+(?:position|role|application)",
+    r"(?:position:|role:|applied for:)\s+([a-z][a-z\s-]+?)(?:\.|$|internship)",
+    r"application for\s+([a-z][a-z\s-]+?)(?:\s+at|\s+with|\.|$)",
+    r"([a-z\s-]+?)\s+(?:summer|fall|spring|winter)\s+(?:intern|internship)",
+    r"(?:software|data|marketing|finance|engineering|product|design)\s+([a-z][a-z\s-]*?)\s+intern",
+    r"intern[:\s-]+([a-z][a-z\s-]+?)(?:\.|$|at)",
+)]
+
+# urls that typically lead to candidate portals, in priority order
+_URL_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"(https?://\S+(?:candidate|portal|application|status|track|hiring|careers|recruit)\S*)",
+    r"(https?://\S*(?:workday|greenhouse|lever|bamboohr|smartrecruiters)\S*)",
+    r"(https?://\S*(?:apply|jobs|careers)\S*portal\S*)",
+    r"(https?://\S*status\S*application\S*)",
+)]
+
+_GENERIC_URL = re.compile(r"https?://\S+")
+_TRAIL_PUNCT = re.compile(r"[.,-]+$")
+_URL_TRAIL = re.compile(r"[.,;:!?)]+$")
+
+# sender domains that don't name the hiring company
+_GENERIC_SENDER_DOMAINS = {
+    "gmail", "googlemail", "outlook", "hotmail", "live", "yahoo", "icloud", "aol", "protonmail",
+    "myworkday", "myworkdaysite", "workday", "greenhouse", "lever", "icims", "smartrecruiters",
+    "jobvite", "taleo", "successfactors", "bamboohr", "ashbyhq", "indeed", "linkedin", "handshake",
+}
+
+# prompt body compaction
+_HTML_TAG = re.compile(r"<[^>]+>")
+_WHITESPACE = re.compile(r"\s+")
+PROMPT_BODY_CHARS = 2000  # limit body length for token efficiency
+
+# shared by the single and batched extraction prompts
+_EXTRACTION_RULES = """EXTRACTION REQUIREMENTS:
+    1. COMPANY: Look everywhere - subject line, sender email domain, email signature, body text. If you see "careers@microsoft.com", that's Microsoft. If subject says "Thanks for applying to Google", that's Google.
+
+    2. POSITION: Check subject line first (often contains job title), then body. Look for words like "intern", "engineer", "analyst", "developer". Even partial matches like "Software Eng" are better than blank.
+
+    3. LOCATION: Look for city/state mentions, addresses, office locations, "remote work", even company headquarters. If it mentions "San Francisco office" or "NYC team", extract that.
+
+    4. PORTAL URL: Find ANY career-related URLs, application tracking links, candidate portals, or links to check application status.
+
+    CRITICAL RULES:
+    - Try MULTIPLE extraction strategies for each field
+    - Use context clues and make reasonable inferences
+    - Extract partial information rather than leaving blank
+    - For company: email domains are often the best source
+    - For position: subject lines usually contain the role
+    - For location: look for any geographic mentions
+"""
+
+def _compact(body: str) -> str:
+    # drop html tags and collapse whitespace so the prompt slice is mostly text
+    body = _HTML_TAG.sub(" ", body)
+    body = _WHITESPACE.sub(" ", body).strip()
+    return body[:PROMPT_BODY_CHARS]
+
+def _cache_key(subject: str, body: str, sender: str) -> str:
+    # content hash of exactly what the prompt sees
+    return hashlib.blake2b(f"{subject}|{sender}|{body[:PROMPT_BODY_CHARS]}".encode(), digest_size=16).hexdigest()
+
+_cache_local = threading.local()
+_cache_table_lock = threading.Lock()
+_cache_table_ready = False
+
+def _cache_conn():
+    # one cache connection per thread (sqlite connections can't cross threads),
+    # reused for every lookup/write; the table is created once per process
+    global _cache_table_ready
+    conn = getattr(_cache_local, "conn", None)
+    if conn is None:
+        conn = get_connection()
+        _cache_local.conn = conn
+    if not _cache_table_ready:
+        with _cache_table_lock:
+            if not _cache_table_ready:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS ai_extraction_cache (
+                        key TEXT PRIMARY KEY,
+                        company TEXT,
+                        position TEXT,
+                        location TEXT,
+                        url TEXT,
+                        method TEXT,
+                        created_at TEXT
+                    )
+                """)
+                conn.commit()
+                _cache_table_ready = True
+    return conn
+
+def _cache_get(key: str) -> Optional[Dict[str, str]]:
+    # return a cached ai extraction, or None on miss
+    try:
+        row = _cache_conn().execute(
+            "SELECT company, position, location, url, method FROM ai_extraction_cache WHERE key = ?",
+            (key,),
+        ).fetchone()
+    except Exception as e:
+        print(f"[DEBUG] AI cache lookup failed: {e}")
+        return None
+    if row is None:
+        return None
+    return {
+        'company': row[0],
+        'position': row[1],
+        'location': row[2],
+        'candidate_portal_url': row[3],
+        'extraction_method': row[4],
+    }
+
+def _cache_put(key: str, result: Dict[str, str]):
+    try:
+        # commits on success, rolls back on error so the thread's connection stays clean
+        with _cache_conn() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO ai_extraction_cache
+                (key, company, position, location, url, method, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                key,
+                result.get('company', ''),
+                result.get('position', ''),
+                result.get('location', ''),
+                result.get('candidate_portal_url', ''),
+                result.get('extraction_method', 'ai'),
+                datetime.now().isoformat(),
+            ))
+    except Exception as e:
+        print(f"[DEBUG] AI cache write failed: {e}")
 
 def extract_with_ai(subject: str, body: str, sender: str) -> Dict[str, str]:
     """
@@ -20,15 +171,27 @@ def extract_with_ai(subject: str, body: str, sender: str) -> Dict[str, str]:
             'company': str,
             'position': str,
             'candidate_portal_url': str,
-            'extraction_method': 'ai' | 'regex' | 'hybrid'
+            'extraction_method': 'ai' | 'regex' | 'regex-fast' | 'hybrid'
         }
     """
 
+    # Skip the model when regex already has a confident answer
+    fast = _regex_fast_path(subject, body, sender)
+    if fast is not None:
+        return fast
+
+    # Reuse a previous AI extraction of the same email
+    prompt_body = _compact(body)
+    key = _cache_key(subject, prompt_body, sender)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
     # Prepare the prompt for AI extraction
     email_text = f"""
     Subject: {subject}
     From: {sender}
-    Body: {body[:2000]}  # Limit body length for token efficiency
+    Body: {prompt_body}
     """
 
     extraction_prompt = f"""
@@ -37,23 +200,7 @@ def extract_with_ai(subject: str, body: str, sender: str) -> Dict[str, str]:
     EMAIL TO ANALYZE:
     {email_text}
 
-    EXTRACTION REQUIREMENTS:
-    1. COMPANY: Look everywhere - subject line, sender email domain, email signature, body text. If you see "careers@microsoft.com", that's Microsoft. If subject says "Thanks for applying to Google", that's Google.
-
-    2. POSITION: Check subject line first (often contains job title), then body. Look for words like "intern", "engineer", "analyst", "developer". Even partial matches like "Software Eng" are better than blank.
-
-    3. LOCATION: Look for city/state mentions, addresses, office locations, "remote work", even company headquarters. If it mentions "San Francisco office" or "NYC team", extract that.
-
-    4. PORTAL URL: Find ANY career-related URLs, application tracking links, candidate portals, or links to check application status.
-
-    CRITICAL RULES:
-    - Try MULTIPLE extraction strategies for each field
-    - Use context clues and make reasonable inferences
-    - Extract partial information rather than leaving blank
-    - For company: email domains are often the best source
-    - For position: subject lines usually contain the role
-    - For location: look for any geographic mentions
-
+    {_EXTRACTION_RULES}
     Return ONLY valid JSON (no extra text):
     {{
         "company": "extracted company name",
@@ -68,26 +215,9 @@ def extract_with_ai(subject: str, body: str, sender: str) -> Dict[str, str]:
         ai_result = call_ai_model(extraction_prompt)
 
         if ai_result and ai_result.strip():
-            # Try to clean up the response and extract JSON
-            clean_response = ai_result.strip()
-
-            # Look for JSON content between ```json and ``` or just find the JSON object
-            if "```json" in clean_response:
-                start = clean_response.find("```json") + 7
-                end = clean_response.find("```", start)
-                if end != -1:
-                    clean_response = clean_response[start:end].strip()
-            elif clean_response.startswith("```") and clean_response.endswith("```"):
-                clean_response = clean_response[3:-3].strip()
-
-            # Find JSON object boundaries
-            if "{" in clean_response and "}" in clean_response:
-                start = clean_response.find("{")
-                end = clean_response.rfind("}") + 1
-                clean_response = clean_response[start:end]
-
-            result = json.loads(clean_response)
+            result = json.loads(_clean_json_response(ai_result))
             result['extraction_method'] = 'ai'
+            _cache_put(key, result)
             return result
         else:
             print(f"[DEBUG] Empty or no response from Gemini API")
@@ -101,30 +231,133 @@ def extract_with_ai(subject: str, body: str, sender: str) -> Dict[str, str]:
     print("[DEBUG] Falling back to regex extraction")
     return extract_with_regex(subject, body, sender)
 
+def _clean_json_response(ai_result: str, open_char: str = "{", close_char: str = "}") -> str:
+    """Strip markdown fences and surrounding text from a JSON model response."""
+    clean_response = ai_result.strip()
+
+    # Look for JSON content between ```json and ``` or just find the JSON object
+    if "```json" in clean_response:
+        start = clean_response.find("```json") + 7
+        end = clean_response.find("```", start)
+        if end != -1:
+            clean_response = clean_response[start:end].strip()
+    elif clean_response.startswith("```") and clean_response.endswith("```"):
+        clean_response = clean_response[3:-3].strip()
+
+    # Find JSON object (or array) boundaries
+    if open_char in clean_response and close_char in clean_response:
+        start = clean_response.find(open_char)
+        end = clean_response.rfind(close_char) + 1
+        clean_response = clean_response[start:end]
+
+    return clean_response
+
+def extract_with_ai_batch(items: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Extract information for several emails with a single AI call.
+
+    items are dicts with 'subject', 'body' and 'sender' keys. Returns one
+    result dict per item, in the same order. Emails the regex fast path or
+    the cache can answer are not sent, and anything the batched response
+    doesn't cover falls back to per-item extraction.
+    """
+    if not items:
+        return []
+
+    results: List[Optional[Dict[str, str]]] = [
+        _regex_fast_path(item.get("subject", ""), item.get("body", ""), item.get("sender", ""))
+        for item in items
+    ]
+    bodies = [_compact(item.get("body", "")) for item in items]
+    keys = [_cache_key(item.get("subject", ""), body, item.get("sender", "")) for item, body in zip(items, bodies)]
+    results = [result if result is not None else _cache_get(key) for result, key in zip(results, keys)]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+
+    emails_text = "\n".join(
+        f"""
+    EMAIL {i}:
+    Subject: {items[i].get("subject", "")}
+    From: {items[i].get("sender", "")}
+    Body: {bodies[i]}
+    """
+        for i in pending
+    )
+
+    extraction_prompt = f"""
+    You are an expert information extraction specialist. Your job is to extract ALL possible information from each of these job application emails. DO NOT leave fields blank unless absolutely impossible to determine.
+
+    EMAILS TO ANALYZE:
+    {emails_text}
+
+    {_EXTRACTION_RULES}
+
+    Return ONLY a valid JSON array (no extra text) with one object per email:
+    [
+        {{
+            "index": email number,
+            "company": "extracted company name",
+            "position": "extracted position title",
+            "location": "extracted location or empty string if truly none found",
+            "candidate_portal_url": "extracted URL or empty string if none found"
+        }}
+    ]
+    """
+
+    ai_result = call_ai_model(extraction_prompt)
+    if ai_result and ai_result.strip():
+        try:
+            for entry in json.loads(_clean_json_response(ai_result, "[", "]")):
+                idx = entry.pop("index", None)
+                if idx in pending and results[idx] is None:
+                    entry['extraction_method'] = 'ai'
+                    results[idx] = entry
+                    _cache_put(keys[idx], entry)
+        except (json.JSONDecodeError, AttributeError, TypeError) as e:
+            print(f"[DEBUG] Batch JSON parsing failed: {e}")
+
+    # anything the batch didn't cover goes through the single-email path
+    return [
+        result if result is not None
+        else extract_with_ai(item.get("subject", ""), item.get("body", ""), item.get("sender", ""))
+        for item, result in zip(items, results)
+    ]
+
+def _load_env():
+    # Load .env file if it exists
+    if os.path.exists('.env'):
+        with open('.env', 'r') as f:
+            for line in f:
+                if line.strip() and '=' in line:
+                    key, value = line.strip().split('=', 1)
+                    os.environ[key] = value
+
+# read once at import instead of on every model call
+_load_env()
+
+@functools.lru_cache(maxsize=1)
+def _get_model():
+    # configure gemini once and reuse the model, None if no api key
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        return None
+
+    genai.configure(api_key=api_key)
+
+    # Use Gemini 1.5 Flash model (free tier)
+    return genai.GenerativeModel('gemini-1.5-flash')
+
 def call_ai_model(prompt: str) -> Optional[str]:
     """
     Call Google Gemini API for AI-powered information extraction.
     """
     try:
-        # Load .env file if it exists
-        if os.path.exists('.env'):
-            with open('.env', 'r') as f:
-                for line in f:
-                    if line.strip() and '=' in line:
-                        key, value = line.strip().split('=', 1)
-                        os.environ[key] = value
-
-        # Configure Gemini API
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
+        model = _get_model()
+        if model is None:
             print("[DEBUG] GEMINI_API_KEY environment variable not set, using regex fallback")
             return None
 
-        genai.configure(api_key=api_key)
-
-        # Use Gemini 1.5 Flash model (free tier)
-        model = genai.GenerativeModel('gemini-1.5-flash')
-
         # Generate response
         response = model.generate_content(prompt)
 
@@ -138,17 +371,41 @@ def call_ai_model(prompt: str) -> Optional[str]:
         print(f"[DEBUG] Gemini API call failed: {e}")
         return None
 
+def _sender_domain_label(address: str) -> str:
+    """Registrable label of a bare address's domain ("stripe" for jobs@mail.stripe.com), or ""."""
+    labels = address.rpartition("@")[2].lower().split(".")
+    return labels[-2] if len(labels) > 1 else ""
+
+def _regex_fast_path(subject: str, body: str, sender: str) -> Optional[Dict[str, str]]:
+    """
+    Regex result when it is trustworthy enough to skip the AI call: both
+    company and position found, and the company is the sender's registrable
+    domain label (not a mail provider or applicant tracking system).
+    """
+    # "Stripe <careers@stripe.com>" -> "careers@stripe.com"
+    address = parseaddr(sender)[1]
+    label = _sender_domain_label(address)
+    if not label or label in _GENERIC_SENDER_DOMAINS:
+        return None
+    result = extract_with_regex(subject, body, address)
+    # a subdomain (app.ashbyhq.com, mail.stripe.com) names something else, leave it to the model
+    if result['company'].lower() != label or not result['position']:
+        return None
+    result['extraction_method'] = 'regex-fast'
+    return result
+
 def extract_with_regex(subject: str, body: str, sender: str) -> Dict[str, str]:
     """
     Enhanced regex extraction with better patterns and URL detection.
     """
+    # built once and shared by the company and position scans
     full_text = f"{subject} {body}".lower()
 
     # Enhanced company extraction
-    company = extract_company_name(subject, body, sender)
+    company = extract_company_name(subject, body, sender, full_text)
 
     # Enhanced position extraction
-    position = extract_position_title(subject, body)
+    position = extract_position_title(subject, body, full_text)
 
     # Extract candidate portal URL
     candidate_portal_url = extract_candidate_portal_url(body)
@@ -160,95 +417,83 @@ def extract_with_regex(subject: str, body: str, sender: str) -> Dict[str, str]:
         'extraction_method': 'regex'
     }
 
-def extract_company_name(subject: str, body: str, sender: str) -> str:
-    """Extract company name using enhanced regex patterns."""
-    full_text = f"{subject} {body}".lower()
+def _first_by_priority(patterns, text: str, accept) -> str:
+    """
+    Try patterns in priority order and return the first accepted match.
+    Each pattern scans the text on its own (as findall did) so overlapping
+    patterns can't hide each other; finditer stops as soon as one is accepted.
+    """
+    for pattern in patterns:
+        for m in pattern.finditer(text):
+            candidate = accept(m.group(1))
+            if candidate:
+                return candidate
+    return ""
 
-    # Try sender domain first
-    if "@" in sender:
-        domain = sender.split("@")[-1].lower()
-        if not domain.endswith((".com", ".org", ".net", ".edu", ".gov")):
-            domain = ""
-
-        # Common company patterns from domain
-        if domain and "noreply" not in domain and "careers" not in domain:
-            company_from_domain = domain.split(".")[0].title()
-            if len(company_from_domain) > 2:
-                return company_from_domain
-
-    # Enhanced company extraction patterns
-    company_patterns = [
-        r"(?:thank you for applying to|your application (?:to|at))\s+([a-z][a-z\s&.-]+?)(?:\s+for|\.|$)",
-        r"(?:at|from|with)\s+([a-z][a-z\s&.-]+?)(?:\s+for|\s+–|\s+-|\s+\||\.|\s+application|$)",
-        r"([a-z][a-z\s&.-]{2,25})\s+(?:application|internship|position|careers|team)",
-        r"application confirmation\s+[–-]\s+([a-z][a-z\s&.-]+)",
-        r"welcome to\s+([a-z][a-z\s&.-]+?)(?:\s|$)",
-        r"([a-z][a-z\s&.-]{3,30})\s+talent\s+team",
-        r"this is to confirm your application to\s+([a-z][a-z\s&.-]+)"
-    ]
+def _accept_company(match: str) -> str:
+    # clean up and validate
+    candidate = _TRAIL_PUNCT.sub("", match.strip()).title()
+    # exclude common false positives
+    if (len(candidate) > 3 and
+        candidate.lower() not in ["the", "and", "for", "with", "this", "your", "our", "team", "application"]):
+        return candidate
+    return ""
 
-    for pattern in company_patterns:
-        matches = re.findall(pattern, full_text, re.IGNORECASE)
-        for match in matches:
-            candidate = match.strip()
-            # Clean up and validate
-            candidate = re.sub(r"[.,-]+$", "", candidate)
-            candidate = candidate.title()
-            # Exclude common false positives
-            if (len(candidate) > 3 and
-                candidate.lower() not in ["the", "and", "for", "with", "this", "your", "our", "team", "application"]):
-                return candidate
+def _accept_position(match: str) -> str:
+    candidate = _TRAIL_PUNCT.sub("", match.strip()).title()
+    if len(candidate) > 3 and candidate.lower() not in ["the", "and", "for", "with", "this", "your", "our"]:
+        return candidate
+    return ""
 
+def _accept_url(match: str) -> str:
+    # clean up the url (remove trailing punctuation)
+    url = _URL_TRAIL.sub("", match)
+    return url if len(url) > 10 else ""  # basic validation
+
+def _company_from_domain(sender: str) -> str:
+    """Company name taken from the sender's email domain, or "" if it has none."""
+    if "@" not in sender:
+        return ""
+    domain = sender.split("@")[-1].lower()
+    if not domain.endswith((".com", ".org", ".net", ".edu", ".gov")):
+        return ""
+
+    # Common company patterns from domain
+    if "noreply" not in domain and "careers" not in domain:
+        company_from_domain = domain.split(".")[0].title()
+        if len(company_from_domain) > 2:
+            return company_from_domain
     return ""
 
-def extract_position_title(subject: str, body: str) -> str:
-    """Extract position title using enhanced regex patterns."""
-    full_text = f"{subject} {body}".lower()
+def extract_company_name(subject: str, body: str, sender: str, full_text: Optional[str] = None) -> str:
+    """Extract company name using enhanced regex patterns."""
+    if full_text is None:
+        full_text = f"{subject} {body}".lower()
 
-    position_patterns = [
-        r"(?:for the|for our|for a)\s+([a-z][a-z\s-]{5,40}?)(?:\s+position|\s+role|\s+internship|\.|$)",
-        r"([a-z][a-z\s-]+?)\s+(?:internship|intern)\s+(?:position|role|application)",
-        r"(?:position:|role:|applied for:)\s+([a-z][a-z\s-]+?)(?:\.|$|internship)",
-        r"application for\s+([a-z][a-z\s-]+?)(?:\s+at|\s+with|\.|$)",
-        r"([a-z\s-]+?)\s+(?:summer|fall|spring|winter)\s+(?:intern|internship)",
-        r"(?:software|data|marketing|finance|engineering|product|design)\s+([a-z][a-z\s-]*?)\s+intern",
-        r"intern[:\s-]+([a-z][a-z\s-]+?)(?:\.|$|at)"
-    ]
+    # Try sender domain first
+    company_from_domain = _company_from_domain(sender)
+    if company_from_domain:
+        return company_from_domain
 
-    for pattern in position_patterns:
-        matches = re.findall(pattern, full_text, re.IGNORECASE)
-        for match in matches:
-            candidate = match.strip()
-            candidate = re.sub(r"[.,-]+$", "", candidate)
-            candidate = candidate.title()
-            if len(candidate) > 3 and candidate.lower() not in ["the", "and", "for", "with", "this", "your", "our"]:
-                return candidate
+    return _first_by_priority(_COMPANY_PATTERNS, full_text, _accept_company)
 
-    return ""
+def extract_position_title(subject: str, body: str, full_text: Optional[str] = None) -> str:
+    """Extract position title using enhanced regex patterns."""
+    if full_text is None:
+        full_text = f"{subject} {body}".lower()
+
+    return _first_by_priority(_POSITION_PATTERNS, full_text, _accept_position)
 
 def extract_candidate_portal_url(body: str) -> str:
     """Extract candidate portal/application tracking URLs."""
 
-    # URL patterns that typically lead to candidate portals
-    url_patterns = [
-        r"https?://[^\s]+(?:candidate|portal|application|status|track|hiring|careers|recruit)[^\s]*",
-        r"https?://[^\s]*(?:workday|greenhouse|lever|bamboohr|smartrecruiters)[^\s]*",
-        r"https?://[^\s]*(?:apply|jobs|careers)[^\s]*portal[^\s]*",
-        r"https?://[^\s]*status[^\s]*application[^\s]*"
-    ]
-
-    for pattern in url_patterns:
-        matches = re.findall(pattern, body, re.IGNORECASE)
-        for match in matches:
-            # Clean up the URL (remove trailing punctuation)
-            url = re.sub(r'[.,;:!?)]+$', '', match)
-            if len(url) > 10:  # Basic validation
-                return url
+    url = _first_by_priority(_URL_PATTERNS, body, _accept_url)
+    if url:
+        return url
 
     # Fallback: look for any HTTPS URL in application-related context
-    general_urls = re.findall(r'https?://[^\s]+', body)
-    for url in general_urls:
-        url = re.sub(r'[.,;:!?)]+$', '', url)
+    for url in _GENERIC_URL.findall(body):
+        url = _URL_TRAIL.sub("", url)
         # Check if URL contains keywords that suggest it's an application portal
         if any(keyword in url.lower() for keyword in
                ['candidate', 'portal', 'status', 'application', 'track', 'hiring', 'apply']):
@@ -6,17 +6,25 @@ Database Utils:
 """
 
 import sqlite3
-from typing import Dict, Any, List
+from contextlib import closing
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 DB_PATH = "internship.db"
 
 def get_connection():
-    # open connection to sqlite database
-    return sqlite3.connect(DB_PATH)
+    # open connection to sqlite database, WAL + relaxed sync so each
+    # batch commit costs a single fsync
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
 
-def insert_email(email: Dict[str, Any]):
+def insert_email(email: Dict[str, Any], conn: Optional[sqlite3.Connection] = None):
     # insery single email into database, ignore if id already exists
-    conn = get_connection()
+    # pass conn to reuse an open connection, otherwise one is opened and closed here
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     cur = conn.cursor()
     cur.execute("""
         INSERT OR IGNORE INTO emails (id, subject, sender, body, is_starred, label)
@@ -30,11 +38,14 @@ def insert_email(email: Dict[str, Any]):
             email["label"]
         ))
     conn.commit()
-    conn.close()
+    if own_conn:
+        conn.close()
 
-def insert_emails(emails: List[Dict[str, Any]]):
+def insert_emails(emails: List[Dict[str, Any]], conn: Optional[sqlite3.Connection] = None):
     # insert multiple emails at once
-    conn = get_connection()
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     cur = conn.cursor()
     cur.executemany("""
         INSERT OR IGNORE INTO emails (id, subject, sender, body, is_starred, label)
@@ -51,13 +62,13 @@ def insert_emails(emails: List[Dict[str, Any]]):
         for email in emails
         ])
     conn.commit()
-    conn.close()
+    if own_conn:
+        conn.close()
 
-def fetch_all():
-    # return all emails currently in database
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM emails")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
\ No newline at end of file
+def fetch_all(conn: Optional[sqlite3.Connection] = None) -> Iterator[Tuple]:
+    # yield all emails currently in database, one row at a time
+    if conn is not None:
+        yield from conn.execute("SELECT * FROM emails")
+        return
+    with closing(get_connection()) as conn:
+        yield from conn.execute("SELECT * FROM emails")
\ No newline at end of file
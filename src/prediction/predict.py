@@ -9,32 +9,44 @@ Predict + Update:
 
 import os
 import re
+import functools
 import joblib
-import sqlite3
+import logging
+import numpy as np
 import pandas as pd
+from itertools import islice
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
 from scipy.sparse import hstack
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
+from src.config.db_utils import get_connection
 from src.preprocessing.clean_text import clean_text
 from src.prediction.update_sheets import update_sheet
-from src.ai_extraction.extract_info import extract_with_ai
+from src.ai_extraction.extract_info import extract_with_ai, extract_with_ai_batch
+from src.scraping.gmail_utils import GMAIL_MAX_WORKERS, get_body_from_payload, get_messages, list_page
 
-DB_PATH = "internship.db"
-TOKEN_PATH = "src/config/gmail_token.json"
 MODEL_DIR = "models"
 
 DEFAULT_START_DATE = "2025/08/05"  # Fallback date for first run
+PREDICT_BATCH_SIZE = 64  # emails held in memory per dedupe/classify pass
+AI_BATCH_SIZE = 15  # emails per AI extraction prompt
+AI_MAX_WORKERS = 4  # concurrent AI calls, kept low for gemini rate limits
 
-def get_gmail_service():
-    creds = Credentials.from_authorized_user_file(TOKEN_PATH)
-    return build("gmail", "v1", credentials=creds)
+FETCH_PROGRESS_EVERY = 500  # emails between fetch progress messages
+
+logger = logging.getLogger(__name__)
 
 def extract_domain(sender):
-    if not isinstance(sender, str) or "@" not in sender:
+    if not isinstance(sender, str):
+        return "unknown"
+    at = sender.rfind("@")
+    if at == -1:
         return "unknown"
-    dom = sender.split("@")[-1].lower()
-    parts = dom.split(".")
-    return ".".join(parts[-2:]) if len(parts) >= 2 else dom
+    dom = sender[at + 1:].lower()
+    # keep the last two dot-separated labels without building lists
+    last_dot = dom.rfind(".")
+    if last_dot == -1:
+        return dom
+    return dom[dom.rfind(".", 0, last_dot) + 1:]
 
 def get_dynamic_query():
     """Get the query date based on the latest date in the sheet, minus 1 day."""
@@ -51,114 +63,108 @@ def get_dynamic_query():
         values = result.get('values', [])
 
         if len(values) <= 1:  # Only headers or empty sheet
-            print(f"[INFO] First run detected, using default start date: {DEFAULT_START_DATE}")
+            logger.info("First run detected, using default start date: %s", DEFAULT_START_DATE)
             return f"after:{DEFAULT_START_DATE}"
 
-        # Parse dates and find the latest one
-        from datetime import datetime, timedelta
-        import re
-
-        latest_date = None
-        for row in values[1:]:  # Skip header
-            if row and row[0] and row[0] != "[Please Enter]":
-                date_str = row[0]
-                try:
-                    # Parse MM-DD-YYYY format
-                    if re.match(r'\d{1,2}-\d{1,2}-\d{4}', date_str):
-                        date_obj = datetime.strptime(date_str, "%m-%d-%Y")
-                        if latest_date is None or date_obj > latest_date:
-                            latest_date = date_obj
-                except:
-                    continue
-
-        if latest_date:
+        # Parse dates (MM-DD-YYYY) in one vectorized pass and find the latest one
+        dates = pd.to_datetime(
+            pd.Series([row[0] for row in values[1:] if row and row[0] and row[0] != "[Please Enter]"], dtype=object),
+            format="%m-%d-%Y",
+            errors="coerce",
+        )
+        latest_date = dates.max()
+
+        if not pd.isna(latest_date):
             # Use the same date (don't subtract 1 day) and format for Gmail query
             query_str = latest_date.strftime("%Y/%m/%d")
-            print(f"[INFO] Latest date in sheet: {latest_date.strftime('%m-%d-%Y')}, querying from: {query_str}")
+            logger.info("Latest date in sheet: %s, querying from: %s", latest_date.strftime('%m-%d-%Y'), query_str)
             return f"after:{query_str}"
         else:
-            print(f"[INFO] No valid dates found in sheet, using default start date: {DEFAULT_START_DATE}")
+            logger.info("No valid dates found in sheet, using default start date: %s", DEFAULT_START_DATE)
             return f"after:{DEFAULT_START_DATE}"
 
     except Exception as e:
-        print(f"[INFO] Could not determine dynamic date ({e}), using default: {DEFAULT_START_DATE}")
+        logger.info("Could not determine dynamic date (%s), using default: %s", e, DEFAULT_START_DATE)
         return f"after:{DEFAULT_START_DATE}"
 
-def fetch_emails():
+def fetch_emails(executor):
     # pull emails since cutoff date (get all emails, not just 200)
+    # only headers are fetched here, bodies are loaded later for new emails
+    # yields one email dict at a time so callers can stream in batches
     query = get_dynamic_query()
-    service = get_gmail_service()
-    msgs = []
     next_page_token = None
     total_fetched = 0
 
-    print(f"[INFO] Starting email fetch with query: {query}")
+    logger.info("Starting email fetch with query: %s", query)
 
     while True:
-        max_results = 500
-        results = service.users().messages().list(
-            userId="me",
-            q=query,
-            maxResults=max_results,
-            pageToken=next_page_token
-        ).execute()
+        results = list_page(next_page_token, q=query)
+
+        ids = [m["id"] for m in results.get("messages", [])]
+        batch_msgs = get_messages(
+            executor, ids, format="metadata", metadataHeaders=["Subject", "From", "Date"]
+        )
 
-        batch_count = 0
-        for m in results.get("messages", []):
-            msg = service.users().messages().get(userId="me", id=m["id"]).execute()
-            payload = msg.get("payload", {})
-            headers = payload.get("headers", [])
+        for msg_id in ids:
+            msg = batch_msgs.get(msg_id)
+            if msg is None:
+                continue
+            headers = msg.get("payload", {}).get("headers", [])
             subject = next((h["value"] for h in headers if h["name"] == "Subject"), "")
             sender = next((h["value"] for h in headers if h["name"] == "From"), "")
             date = next((h["value"] for h in headers if h["name"] == "Date"), "")
-            body = _get_body(payload)
 
-            msgs.append(
-                {
-                    "id": m["id"],
-                    "subject": subject,
-                    "sender": sender,
-                    "date": date,
-                    "body": body,
-                }
-            )
+            yield {
+                "id": msg_id,
+                "subject": subject,
+                "sender": sender,
+                "date": date,
+                "body": "",
+            }
 
-            batch_count += 1
             total_fetched += 1
 
-            # Progress indicator every 100 emails
-            if total_fetched % 100 == 0:
-                print(f"[INFO] {total_fetched} emails fetched...")
-
-        # Show progress for smaller batches too
-        if batch_count > 0:
-            print(f"[INFO] Batch complete: {batch_count} emails processed (total: {total_fetched})")
+            # Progress indicator every 500 emails
+            if total_fetched % FETCH_PROGRESS_EVERY == 0:
+                logger.info("%d emails fetched...", total_fetched)
 
         # Check if there are more pages
         next_page_token = results.get('nextPageToken')
         if not next_page_token:
             break
 
-        print(f"[DEBUG] Fetched {len(msgs)} emails so far, getting more...")
-
-    return msgs
-
-def _get_body(payload):
-    # recursive parse mime parts
-    if "body" in payload and "data" in payload["body"] and payload["body"]["data"]:
-        import base64
-    
-        data = payload["body"]["data"]
-        return base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
-    if "parts" in payload:
-        for part in payload["parts"]:
-            text = _get_body(part)
-            if text:
-                return text
-    return ""
-
-def dedupe_new(emails):
-    conn = sqlite3.connect(DB_PATH)
+        logger.debug("Fetched %d emails so far, getting more...", total_fetched)
+
+def fetch_bodies(emails, executor):
+    # load full message bodies, only for emails that survived dedupe;
+    # emails whose body could not be fetched are left out (not stored, so the
+    # next run picks them up again) rather than classified from the subject
+    if not emails:
+        return emails
+    full_msgs = get_messages(executor, [e["id"] for e in emails], format="full")
+    fetched = []
+    for e in emails:
+        msg = full_msgs.get(e["id"])
+        if msg is None:
+            continue
+        e["body"] = get_body_from_payload(msg.get("payload", {}))
+        fetched.append(e)
+    if len(fetched) < len(emails):
+        logger.warning("Could not fetch %d message bodies, they will be retried next run", len(emails) - len(fetched))
+    return fetched
+
+def _connect():
+    # shared db_utils connection plus a larger page cache for the dedupe scans
+    conn = get_connection()
+    conn.execute("PRAGMA cache_size=-20000")
+    return conn
+
+def dedupe_new(emails, conn=None):
+    # database-only check (no gmail calls): emails neither stored nor processed yet
+    # pass conn to reuse an open connection, otherwise one is opened and closed here
+    own_conn = conn is None
+    if own_conn:
+        conn = _connect()
     cur = conn.cursor()
 
     # Create tables if they don't exist
@@ -184,34 +190,39 @@ def dedupe_new(emails):
     """)
     conn.commit()
 
-    # Get emails already in database
-    existing = pd.read_sql("SELECT id FROM emails_raw", conn)
-    seen_in_db = set(existing["id"].tolist())
-
-    # Get emails already processed into applications
-    processed = pd.read_sql("SELECT email_id FROM processed_applications", conn)
-    processed_emails = set(processed["email_id"].tolist())
-
-    # Filter out emails that are already in database
-    fresh = [e for e in emails if e["id"] not in seen_in_db]
-
-    # Insert all new emails into db
-    for e in fresh:
-        cur.execute(
-            "INSERT OR IGNORE INTO emails_raw (id, subject, sender, date, body) VALUES (?, ?, ?, ?, ?)",
-            (e["id"], e["subject"], e["sender"], e["date"], e["body"]),
-        )
-
-    # Also filter out emails that were already processed into applications
-    # This prevents the same email from being classified and added to sheets multiple times
-    truly_new = [e for e in fresh if e["id"] not in processed_emails]
+    # Push this batch's ids into a temp table and let sqlite find the ones
+    # neither stored nor already processed into applications (this prevents
+    # the same email from being classified and added to sheets multiple times)
+    cur.execute("CREATE TEMP TABLE IF NOT EXISTS incoming_ids (id TEXT PRIMARY KEY)")
+    cur.execute("DELETE FROM incoming_ids")
+    cur.executemany("INSERT OR IGNORE INTO incoming_ids (id) VALUES (?)", [(e["id"],) for e in emails])
+    new_ids = {row[0] for row in cur.execute("""
+        SELECT id FROM incoming_ids
+        WHERE id NOT IN (SELECT id FROM emails_raw)
+          AND id NOT IN (SELECT email_id FROM processed_applications)
+    """)}
+    truly_new = [e for e in emails if e["id"] in new_ids]
 
     conn.commit()
-    conn.close()
+    if own_conn:
+        conn.close()
 
-    print(f"[DEBUG] {len(emails)} total emails, {len(fresh)} new in database, {len(truly_new)} not yet processed")
+    logger.debug("%d total emails, %d not yet stored or processed", len(emails), len(truly_new))
     return truly_new
 
+def store_new(emails, conn=None):
+    # insert emails (with their bodies) into emails_raw so later runs skip them
+    own_conn = conn is None
+    if own_conn:
+        conn = _connect()
+    conn.executemany(
+        "INSERT OR IGNORE INTO emails_raw (id, subject, sender, date, body) VALUES (?, ?, ?, ?, ?)",
+        [(e["id"], e["subject"], e["sender"], e["date"], e["body"]) for e in emails],
+    )
+    conn.commit()
+    if own_conn:
+        conn.close()
+
 
 def build_features(emails, tfidf_subject, tfidf_body, domain_encoder):
     subs = [clean_text(e["subject"]) for e in emails]
@@ -221,17 +232,12 @@ def build_features(emails, tfidf_subject, tfidf_body, domain_encoder):
     X_sub = tfidf_subject.transform(subs)
     X_body = tfidf_body.transform(bods)
     # Map domains to known categories or "other"
-    mapped_doms = []
-    for d in doms:
-        if hasattr(domain_encoder, 'categories_') and len(domain_encoder.categories_) > 0:
-            if d in domain_encoder.categories_[0]:
-                mapped_doms.append([d])
-            else:
-                mapped_doms.append(["other"])
-        else:
-            mapped_doms.append([d])
-    X_dom = domain_encoder.transform(mapped_doms)
-    return hstack([X_sub, X_body, X_dom])
+    doms_arr = np.asarray(doms, dtype=object)
+    if hasattr(domain_encoder, 'categories_') and len(domain_encoder.categories_) > 0:
+        known = np.isin(doms_arr, domain_encoder.categories_[0])
+        doms_arr = np.where(known, doms_arr, "other")
+    X_dom = domain_encoder.transform(doms_arr.reshape(-1, 1))
+    return hstack([X_sub, X_body, X_dom], format="csr")
 
 def extract_company_position(subject, body, sender=""):
     """
@@ -242,7 +248,7 @@ def extract_company_position(subject, body, sender=""):
         result = extract_with_ai(subject, body, sender)
         return result['company'], result['position']
     except Exception as e:
-        print(f"[DEBUG] AI extraction failed, using legacy regex: {e}")
+        logger.debug("AI extraction failed, using legacy regex: %s", e)
         # Fallback to original regex logic (simplified version)
         full_text = f"{subject} {body}".lower()
 
@@ -262,56 +268,73 @@ def extract_enhanced_info(subject, body, sender=""):
     """
     return extract_with_ai(subject, body, sender)
 
-def classify(emails):
-    print("[INFO] Loading ML model and vectorizers...")
-    # load model + vectorizers
+def extract_enhanced_info_batch(emails):
+    """
+    Batched version of extract_enhanced_info, one AI call for all emails.
+    Returns a list of dicts in the same order as emails.
+    """
+    return extract_with_ai_batch(
+        [{"subject": e["subject"], "body": e["body"], "sender": e.get("sender", "")} for e in emails]
+    )
+
+@functools.lru_cache(maxsize=1)
+def _load_artifacts():
+    # deserialize model + vectorizers once per process; the body tf-idf idf array
+    # is memory-mapped so the os page cache can share it between runs (the other
+    # artifacts are saved compressed, which rules out mmap)
+    logger.info("Loading ML model and vectorizers...")
     model = joblib.load(os.path.join(MODEL_DIR, "log_reg.pkl"))
     tfidf_subject = joblib.load(os.path.join(MODEL_DIR, "tfidf_subject.pkl"))
-    tfidf_body = joblib.load(os.path.join(MODEL_DIR, "tfidf_body.pkl"))
+    tfidf_body = joblib.load(os.path.join(MODEL_DIR, "tfidf_body.pkl"), mmap_mode="r")
     domain_encoder = joblib.load(os.path.join(MODEL_DIR, "domain_encoder.pkl"))
+    return model, tfidf_subject, tfidf_body, domain_encoder
+
+def classify(emails):
+    # load model + vectorizers (cached after the first call)
+    model, tfidf_subject, tfidf_body, domain_encoder = _load_artifacts()
 
-    print(f"[INFO] Classifying {len(emails)} emails...")
+    logger.debug("Classifying %d emails...", len(emails))
     X = build_features(emails, tfidf_subject, tfidf_body, domain_encoder)
-    preds = model.predict(X)
+    # binary logistic regression: class 1 (Submitted) iff the decision score is positive
+    preds = (model.decision_function(X) > 0).astype(int)
 
     # Count predictions
     submitted_count = sum(preds)
-    print(f"[INFO] Classification complete: {submitted_count}/{len(emails)} emails classified as submitted")
+    logger.debug("Classification complete: %d/%d emails classified as submitted", submitted_count, len(emails))
 
-    submitted = []
-    processed_count = 0
-
-    print("[INFO] Starting AI extraction for submitted applications...")
-    for e, p in zip(emails, preds):
-        if p == 1:
-            processed_count += 1
-            print(f"[INFO] Processing application {processed_count}/{submitted_count}: {e['subject'][:50]}...")
+    submitted_emails = [e for e, p in zip(emails, preds) if p == 1]
+    chunks = [
+        submitted_emails[i:i + AI_BATCH_SIZE]
+        for i in range(0, len(submitted_emails), AI_BATCH_SIZE)
+    ]
 
-            # extract enhanced information including candidate portal URL
-            enhanced_info = extract_enhanced_info(e["subject"], e["body"], e.get("sender", ""))
-
-            # Show extraction results
-            company = enhanced_info.get("company", "")
-            position = enhanced_info.get("position", "")
-            method = enhanced_info.get("extraction_method", "unknown")
+    logger.debug("Starting AI extraction for submitted applications...")
+    # one prompt per chunk, chunks dispatched concurrently since calls are I/O bound
+    with ThreadPoolExecutor(max_workers=AI_MAX_WORKERS) as executor:
+        chunk_results = list(executor.map(extract_enhanced_info_batch, chunks))
 
+    submitted = []
+    for chunk, results in zip(chunks, chunk_results):
+        for e, enhanced_info in zip(chunk, results):
             submitted.append(
                 {
                     "email_id": e["id"],  # Include email ID for tracking
                     "date": e["date"],
-                    "company": company,
-                    "position": position,
+                    "company": enhanced_info.get("company", ""),
+                    "position": enhanced_info.get("position", ""),
                     "candidate_portal_url": enhanced_info.get("candidate_portal_url", ""),
-                    "extraction_method": method
+                    "extraction_method": enhanced_info.get("extraction_method", "unknown")
                 }
             )
 
-    print(f"[INFO] AI extraction complete! {len(submitted)} applications ready for Google Sheets")
+    logger.debug("AI extraction complete! %d applications ready for Google Sheets", len(submitted))
     return submitted
 
-def record_processed_applications(submitted_apps, email_mapping):
+def record_processed_applications(submitted_apps, email_mapping, conn=None):
     """Record which emails have been successfully processed into applications."""
-    conn = sqlite3.connect(DB_PATH)
+    own_conn = conn is None
+    if own_conn:
+        conn = _connect()
     cur = conn.cursor()
 
     from datetime import datetime
@@ -328,39 +351,63 @@ def record_processed_applications(submitted_apps, email_mapping):
             """, (email_id, app.get('company', ''), app.get('position', ''), current_time))
 
     conn.commit()
-    conn.close()
-    print(f"[DEBUG] Recorded {len(submitted_apps)} processed applications in database")
+    if own_conn:
+        conn.close()
+    logger.debug("Recorded %d processed applications in database", len(submitted_apps))
 
 def predict_and_update():
-    raw = fetch_emails()
-    print(f"[DEBUG] Fetched {len(raw)} total emails")
+    # stream emails through dedupe + classify in fixed size batches so only
+    # one batch of bodies is held in memory at a time
+    # one sqlite connection and one gmail worker pool (each worker keeps its
+    # service) are shared by every step of the run
+    with closing(_connect()) as conn, ThreadPoolExecutor(max_workers=GMAIL_MAX_WORKERS) as executor:
+        emails = fetch_emails(executor)
+        submitted_apps = []
+        total_fetched = 0
+        total_new = 0
+
+        while True:
+            raw = list(islice(emails, PREDICT_BATCH_SIZE))
+            if not raw:
+                break
+            total_fetched += len(raw)
+
+            new_emails = dedupe_new(raw, conn)
+            if not new_emails:
+                continue
+
+            # bodies were not downloaded with the headers, load them for new
+            # emails only; store just the ones whose body actually arrived
+            new_emails = fetch_bodies(new_emails, executor)
+            store_new(new_emails, conn)
+            if not new_emails:
+                continue
+            total_new += len(new_emails)
 
-    new_emails = dedupe_new(raw)
-    print(f"[DEBUG] {len(new_emails)} new emails after deduplication")
+            submitted_apps.extend(classify(new_emails))
 
-    if not new_emails:
-        print("[INFO] no new emails found")
-        return
+        logger.info("Fetched %d total emails", total_fetched)
+        logger.info("%d new emails after deduplication", total_new)
 
-    # Show first few email subjects for debugging
-    for i, email in enumerate(new_emails[:3]):
-        print(f"[DEBUG] Email {i+1}: {email['subject'][:50]}...")
+        if not total_new:
+            logger.info("no new emails found")
+            return
 
-    submitted_apps = classify(new_emails)
-    print(f"[DEBUG] {len(submitted_apps)} emails classified as submitted")
+        logger.info("%d emails classified as submitted", len(submitted_apps))
 
-    if not submitted_apps:
-        print("[INFO] no new submitted applications")
-        return
+        if not submitted_apps:
+            logger.info("no new submitted applications")
+            return
 
-    update_sheet(submitted_apps)
+        update_sheet(submitted_apps)
 
-    # Record the applications as processed to prevent future duplicates
-    record_processed_applications(submitted_apps, {})
+        # Record the applications as processed to prevent future duplicates
+        record_processed_applications(submitted_apps, {}, conn)
 
-    print(f"[INFO] added {len(submitted_apps)} new submitted applications")
+        logger.info("added %d new submitted applications", len(submitted_apps))
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
     predict_and_update()
 
 if __name__ == "__main__":
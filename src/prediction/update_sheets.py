@@ -7,6 +7,8 @@ Sheets Update:
 """
 import os
 import re
+import functools
+import pandas as pd
 from datetime import datetime
 from googleapiclient.discovery import build
 from google.oauth2.service_account import Credentials
@@ -28,8 +30,15 @@ HEADERS = [
 
 STATUS_ORDER = {"Accepted": 1, "In Progress": 2, "Submitted": 3, "Rejected": 4}
 
+# email date header patterns used by format_date
+_TZ_OFFSET_RE = re.compile(r'[+-]\d{4}')
+_TZ_STRIP_RE = re.compile(r'\s*[+-]\d{4}.*$')
+_TZ_PAREN_RE = re.compile(r'\s*\([A-Z]{3,4}\).*$')
+_STD_EMAIL_RE = re.compile(r'\w{3}, \d{1,2} \w{3} \d{4} \d{2}:\d{2}:\d{2}')
+
+@functools.lru_cache(maxsize=1)
 def get_service():
-    # connect to sheets api
+    # connect to sheets api once per process
     creds = Credentials.from_service_account_file(
         CREDS_PATH, scopes=["https://www.googleapis.com/auth/spreadsheets"]
     )
@@ -38,23 +47,24 @@ def get_service():
 
 SPREADSHEET_ID = "1kBsUCDGPFvVL0tCnJqjAHLdc_H-5utkMCP7FeYhAeGc"
 
+@functools.lru_cache(maxsize=4096)
 def format_date(date_str):
-    """Convert email date to MM-DD-YYYY format."""
+    """Convert email date to MM-DD-YYYY format (memoized, dates repeat within a batch)."""
     if not date_str:
         return ""
     
     try:
         # Handle different email date formats
-        if re.search(r'[+-]\d{4}', date_str):
+        if _TZ_OFFSET_RE.search(date_str):
             # Full email timestamp: "Wed, 3 Sep 2025 14:30:29 +0000" or "Thu, 11 Sep 2025 18:55:03 +0000 (UTC)"
             # Remove timezone info: everything after +/- timezone
-            clean_date = re.sub(r'\s*[+-]\d{4}.*$', '', date_str).strip()
+            clean_date = _TZ_STRIP_RE.sub('', date_str).strip()
             dt = datetime.strptime(clean_date, "%a, %d %b %Y %H:%M:%S")
         elif any(tz in date_str.upper() for tz in ["GMT", "EDT", "EST", "UTC", "PST", "CST", "PDT"]):
             # Handle timezone abbreviations without +/- offset
-            clean_date = re.sub(r'\s*\([A-Z]{3,4}\).*$', '', date_str).strip()  
+            clean_date = _TZ_PAREN_RE.sub('', date_str).strip()
             dt = datetime.strptime(clean_date, "%a, %d %b %Y %H:%M:%S")
-        elif re.match(r'\w{3}, \d{1,2} \w{3} \d{4} \d{2}:\d{2}:\d{2}', date_str):
+        elif _STD_EMAIL_RE.match(date_str):
             # Standard email format without timezone: "Wed, 3 Sep 2025 14:30:29"
             dt = datetime.strptime(date_str, "%a, %d %b %Y %H:%M:%S")
         elif "-" in date_str and ":" in date_str:
@@ -74,17 +84,42 @@ def format_date(date_str):
         print(f"[DEBUG] Could not parse date '{date_str}': {e}")
         return date_str  # Return original if parsing fails
 
-def setup_sheet_formatting(service, spreadsheet_id):
-    """Set up headers, formatting, column widths, and data validation."""
+def format_dates_bulk(date_strs):
+    """
+    Vectorized format_date for a list of email dates.
+    Standard email headers are parsed in one pandas pass; anything else
+    falls back to format_date, so each item matches format_date's output.
+    """
+    if not date_strs:
+        return []
+    raw = pd.Series(date_strs, dtype=object).fillna("")
+    cleaned = (
+        raw.str.replace(_TZ_STRIP_RE, "", regex=True)
+        .str.replace(_TZ_PAREN_RE, "", regex=True)
+        .str.strip()
+    )
+    parsed = pd.to_datetime(cleaned, format="%a, %d %b %Y %H:%M:%S", errors="coerce", cache=True)
+    formatted = parsed.dt.strftime("%m-%d-%Y")
+    missing = formatted.isna()
+    formatted[missing] = raw[missing].map(format_date)
+    return formatted.tolist()
+
+def _string_row(values):
+    # RowData of raw strings (same as valueInputOption="RAW")
+    return {"values": [{"userEnteredValue": {"stringValue": v}} for v in values]}
+
+def formatting_requests():
+    """Requests that set headers, formatting, column widths, and data validation."""
     requests = []
     
     # Set headers (now includes Candidate Portal URL)
-    service.spreadsheets().values().update(
-        spreadsheetId=spreadsheet_id,
-        range="Sheet1!A1:H1",
-        valueInputOption="RAW",
-        body={"values": [HEADERS]}
-    ).execute()
+    requests.append({
+        "updateCells": {
+            "range": {"sheetId": 0, "startRowIndex": 0, "endRowIndex": 1, "startColumnIndex": 0, "endColumnIndex": len(HEADERS)},
+            "rows": [_string_row(HEADERS)],
+            "fields": "userEnteredValue"
+        }
+    })
     
     # Bold and freeze header row
     requests.extend([
@@ -164,7 +199,7 @@ def setup_sheet_formatting(service, spreadsheet_id):
     # Add conditional formatting for status colors and placeholder text
     # Status colors: Submitted = light green, In Progress = light yellow, Rejected = light red, Accepted = light blue
     # Placeholder text: "[Please Enter]" = grey italic
-    conditional_formatting_requests = [
+    requests.extend([
         # Placeholder text formatting for all columns except Status
         {
             "addConditionalFormatRule": {
@@ -234,75 +269,45 @@ def setup_sheet_formatting(service, spreadsheet_id):
                 "index": 4
             }
         }
-    ]
-
-    # Execute all formatting requests
-    if requests:
-        service.spreadsheets().batchUpdate(
-            spreadsheetId=spreadsheet_id,
-            body={"requests": requests}
-        ).execute()
+    ])
 
-    # Execute conditional formatting separately
-    if conditional_formatting_requests:
-        service.spreadsheets().batchUpdate(
-            spreadsheetId=spreadsheet_id,
-            body={"requests": conditional_formatting_requests}
-        ).execute()
+    return requests
 
 def get_or_create_sheet(service):
-    """Get existing sheet and set up formatting."""
-    setup_sheet_formatting(service, SPREADSHEET_ID)
+    """Get existing sheet id (formatting is applied with the row update)."""
     return SPREADSHEET_ID
 
 
-def append_rows(service, spreadsheet_id, rows):
-    # insert new rows under headers
-    service.spreadsheets().values().append(
-        spreadsheetId=spreadsheet_id,
-        range="Sheet1!A1",
-        valueInputOption="RAW",
-        insertDataOption="INSERT_ROWS",
-        body={"values": rows},
-    ).execute()
+def append_rows_request(rows):
+    # insert new rows under the last row with data
+    return {
+        "appendCells": {
+            "sheetId": 0,
+            "rows": [_string_row(row) for row in rows],
+            "fields": "userEnteredValue"
+        }
+    }
 
-def apply_sort(service, spreadsheet_id):
+def sort_request():
     """Sort by Status priority, then by Date Received (newest first)."""
-    requests = [
-        {
-            "sortRange": {
-                "range": {"sheetId": 0, "startRowIndex": 1},  # Skip header row
-                "sortSpecs": [
-                    {"dimensionIndex": 3, "sortOrder": "ASCENDING"},   # Status column (D)
-                    {"dimensionIndex": 4, "sortOrder": "DESCENDING"},  # Date Received column (E), newest first
-                ]
-            }
+    return {
+        "sortRange": {
+            "range": {"sheetId": 0, "startRowIndex": 1},  # Skip header row
+            "sortSpecs": [
+                {"dimensionIndex": 3, "sortOrder": "ASCENDING"},   # Status column (D)
+                {"dimensionIndex": 4, "sortOrder": "DESCENDING"},  # Date Received column (E), newest first
+            ]
         }
-    ]
-
-    service.spreadsheets().batchUpdate(
-        spreadsheetId=spreadsheet_id, body={"requests": requests}
-    ).execute()
+    }
 
-def reapply_status_validation(service, spreadsheet_id):
-    # get current data to determine range
-    result = service.spreadsheets().values().get(
-        spreadsheetId=spreadsheet_id,
-        range="Sheet1!A:A"
-    ).execute()
-    values = result.get('values', [])
-    last_row = len(values)
-    
-    if last_row <= 1:  # only headers or empty sheet
-        return
-    
-    # apply dropdown validation to status column (column D) for all data rows
-    request = {
+def status_validation_request():
+    # dropdown validation on the status column for every data row
+    # (no endRowIndex = through the end of the sheet, so no row count lookup is needed)
+    return {
         "setDataValidation": {
             "range": {
                 "sheetId": 0,
                 "startRowIndex": 1,  # start from row 2 (after headers)
-                "endRowIndex": last_row,  # through last row with data
                 "startColumnIndex": 2,  # status column (C)
                 "endColumnIndex": 3
             },
@@ -321,18 +326,14 @@ def reapply_status_validation(service, spreadsheet_id):
             }
         }
     }
-    
-    service.spreadsheets().batchUpdate(
-        spreadsheetId=spreadsheet_id,
-        body={"requests": [request]}
-    ).execute()
 
 
 def update_sheet(new_apps):
     service = get_service()
     spreadsheet_id = get_or_create_sheet(service)
+    dates = format_dates_bulk([app.get("date", "") for app in new_apps])
     rows = []
-    for app in new_apps:
+    for app, date in zip(new_apps, dates):
         # New column order: Company, Position, Status, Location, Date Received, Candidate Portal URL, Compensation, Notes
         rows.append(
             [
@@ -340,19 +341,24 @@ def update_sheet(new_apps):
                 app.get("position", "") or "[Please Enter]",
                 "Submitted",  # status (default)
                 app.get("location", "") or "[Please Enter]",  # location (AI extracted, can be manually edited)
-                format_date(app.get("date", "")) or "[Please Enter]",  # date received (formatted)
+                date or "[Please Enter]",  # date received (formatted)
                 app.get("candidate_portal_url", "") or "[Please Enter]",  # candidate portal URL (AI extracted)
                 "[Please Enter]",  # compensation (manual)
                 "[Please Enter]",  # notes (manual)
             ]
         )
 
-    append_rows(service, spreadsheet_id, rows)
-    
-    # reapply dropdown validation after data insertion (fixes validation override issue)
-    reapply_status_validation(service, spreadsheet_id)
-    
-    apply_sort(service, spreadsheet_id)
+    # headers/formatting, new rows, validation and sort in a single round trip;
+    # requests apply in order, so validation is reapplied after the insert
+    # (fixes validation override issue) and the sort sees the new rows
+    requests = formatting_requests()
+    if rows:
+        requests.append(append_rows_request(rows))
+    requests.append(status_validation_request())
+    requests.append(sort_request())
+    service.spreadsheets().batchUpdate(
+        spreadsheetId=spreadsheet_id, body={"requests": requests}
+    ).execute()
     print(f"[INFO] added {len(rows)} rows and applied sort")
 
 if __name__ == "__main__":
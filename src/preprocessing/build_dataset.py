@@ -1,7 +1,6 @@
 """
 Build Dataset:
-    - load emails from sqlite
-    - remove duplicates
+    - load emails from sqlite, removing duplicates
     - clean and normalize text
     - verify labels and report counts
     - split into train/val/test
@@ -10,17 +9,25 @@ Build Dataset:
 
 import os
 import json
+import functools
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import sqlite3
-from sklearn.model_selection import train_test_split
-from .clean_text import clean_text
+from .clean_text import clean_text_series
 
 DEFAULT_DB_PATH = "internship.db"
 CFG_PATH = os.path.join("src", "config", "db_config.json")
 OUTPUT_DIR = "data"
+EMAIL_COLUMNS = ["id", "subject", "sender", "body", "label"]
+READ_CHUNKSIZE = 10_000
+PROCESSED_COLUMNS = ["id", "label", "processed_text"]
+WRITE_CHUNKSIZE = 300  # rows per INSERT, keeps 3 columns under sqlite's 999 variable limit
 
+@functools.lru_cache(maxsize=1)
 def get_db_path():
-    # try to read db path from config
+    # try to read db path from config (once per process)
     if os.path.exists(CFG_PATH):
         try:
             with open(CFG_PATH, "r", encoding="utf-8") as f:
@@ -31,21 +38,29 @@ def get_db_path():
     return DEFAULT_DB_PATH
 
 def load_emails(db_path):
-    # pull all emails from db
+    # stream the columns the pipeline uses in chunks, dropping duplicate
+    # subject+body rows as we go (keeps the first inserted row, like drop_duplicates did);
+    # seen holds the exact (subject, body) pairs so distinct emails are never merged
+    query = f"SELECT {', '.join(EMAIL_COLUMNS)} FROM emails ORDER BY rowid"
+    seen = set()
+    chunks = []
     conn = sqlite3.connect(db_path)
-    df = pd.read_sql("SELECT * FROM emails", conn)
+    for chunk in pd.read_sql(query, conn, chunksize=READ_CHUNKSIZE):
+        keep = []
+        for key in zip(chunk["subject"], chunk["body"]):
+            keep.append(key not in seen)
+            seen.add(key)
+        chunks.append(chunk[keep])
     conn.close()
-    return df
-
-def remove_duplicates(df):
-    # drop duplicate rows by subject+body
-    return df.drop_duplicates(subset=["subject", "body"])
+    if not chunks:
+        return pd.DataFrame(columns=EMAIL_COLUMNS)
+    return pd.concat(chunks, ignore_index=True)
 
 def add_processed_text(df):
     # build procesed_text column from subject+body
-    df["processed_text"] = (
+    df["processed_text"] = clean_text_series(
         df["subject"].fillna("") + df["body"].fillna("")
-    ).apply(clean_text)
+    )
     return df
 
 def verify_labels(df):
@@ -58,25 +73,43 @@ def verify_labels(df):
     print(df[mask]["label"].value_counts())
     return df[mask].copy()
 
+def stratified_split(df, train_frac=0.7, val_frac=0.15, seed=42):
+    # shuffle each label's row positions once and slice them into
+    # train/val/test ranges, so every split keeps the label ratio
+    rng = np.random.default_rng(seed)
+    parts = ([], [], [])
+    for idx in df.groupby("label").indices.values():
+        idx = rng.permutation(idx)
+        n = len(idx)
+        cuts = (0, int(train_frac * n), int((train_frac + val_frac) * n), n)
+        for part, lo, hi in zip(parts, cuts, cuts[1:]):
+            part.append(idx[lo:hi])
+    return tuple(df.iloc[rng.permutation(np.concatenate(part))] for part in parts)
+
 def split_and_save(df):
-    # split into train/val/test and save csvs
+    # split into train/val/test and save csvs (pyarrow writer)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    train, temp = train_test_split(df, test_size=0.3, stratify=df["label"], random_state=42)
-    val, test = train_test_split(temp, test_size=0.5, stratify=temp["label"],  random_state=42)
-    train.to_csv(os.path.join(OUTPUT_DIR, "train.csv"), index=False)
-    val.to_csv(os.path.join(OUTPUT_DIR, "val.csv"), index=False)
-    test.to_csv(os.path.join(OUTPUT_DIR, "test.csv"), index=False)
+    train, val, test = stratified_split(df)
+    for name, part in (("train", train), ("val", val), ("test", test)):
+        pacsv.write_csv(
+            pa.Table.from_pandas(part, preserve_index=False),
+            os.path.join(OUTPUT_DIR, f"{name}.csv")
+        )
 
 def save_to_db(df, db_path):
-    # write processed table back into db
+    # write processed table back into db (only the columns it adds to emails),
+    # as multi-row inserts in one transaction
     conn = sqlite3.connect(db_path)
-    df.to_sql("emails_processed", conn, if_exists="replace", index=False)
+    with conn:
+        df[PROCESSED_COLUMNS].to_sql(
+            "emails_processed", conn, if_exists="replace", index=False,
+            method="multi", chunksize=WRITE_CHUNKSIZE
+        )
     conn.close()
 
 def main():
     db_path = get_db_path()
     df = load_emails(db_path)
-    df = remove_duplicates(df)
     df = add_processed_text(df)
     df_ok = verify_labels(df)
     split_and_save(df_ok)
@@ -3,46 +3,80 @@ Clean Text:
     - strip html tags to plain text
     - remove boilerplate (unsubscribe, privacy, phone sigs)
     - normalize spaces and lowercase
+    - vectorized variant for whole pandas columns
 """
 
 import re
-from bs4 import BeautifulSoup
+import pandas as pd
+from selectolax.lexbor import LexborHTMLParser
 
 # common footer/boilerplate bits
-_BOILER = re.compile(
-    r"(unsubscribe|view in browser|privacy policy|manage preferences|"
+_BOILER_PATTERN = (
+    r"unsubscribe|view in browser|privacy policy|manage preferences|"
     r"update preferences|terms of service|do not reply|no[- ]reply|"
     r"confidentiality notice|to stop receiving|footer address|mailing address|"
-    r"sent from my (iphone|ipad|android)|get the app|view online)",
-    flags=re.IGNORECASE,
+    r"sent from my (?:iphone|ipad|android)|get the app|view online"
 )
+_BOILER = re.compile(_BOILER_PATTERN, re.IGNORECASE)
 
 # simple url + email tokens (we don’t care about exact values)
-_URL_OR_EMAIL = re.compile(r"(https?://\S+|www\.\S+|[\w\.-]+@[\w\.-]+)", re.IGNORECASE)
+_URL_OR_EMAIL_PATTERN = r"https?://\S+|www\.\S+|[\w\.-]+@[\w\.-]+"
 
-# quoted reply markers are noisy for training
-_QUOTED_MARK = re.compile(r"^(>+)|^(on .+ wrote:)$", re.IGNORECASE)
+# one pass over the text: any run of whitespace and urls/emails collapses to a
+# single space. boilerplate is removed before it, since it can sit inside a url
+# (https://x.com/unsubscribe?id=1 leaves "?id=1" behind)
+_NOISE_PATTERN = rf"(?:\s+|{_URL_OR_EMAIL_PATTERN})+"
+_NOISE_RUN = re.compile(_NOISE_PATTERN, re.IGNORECASE)
+
+# quoted reply lines ("> ..." or "on ... wrote:") are noisy for training
+_QUOTED_LINE_PATTERN = r"(?im)^[^\S\n]*(?:>.*|on .+ wrote:[^\S\n]*)$"
+_QUOTED_LINE = re.compile(_QUOTED_LINE_PATTERN)
+
+# only text with a quote marker or "wrote:" can have quoted reply lines
+_QUOTE_HINT = re.compile(r">|wrote:", re.IGNORECASE)
+
+# only text with tags or entities needs the html parser
+_HTML_HINT_PATTERN = r"[<&]"
 
 def _strip_html(text: str) -> str:
-    # parse html to text
-    return BeautifulSoup(text, "html.parser").get_text(separator=" ")
+    # parse html to text, plain text (no tags or entities) needs no parsing
+    if "<" not in text and "&" not in text:
+        return text
+    tree = LexborHTMLParser(text)
+    # script/style contents aren't text (bs4's get_text skipped them too)
+    tree.strip_tags(["script", "style"])
+    return tree.text(separator=" ")
 
 def _drop_quoted_lines(text: str) -> str:
-    # remove typical quoted reply lines
-    lines = []
-    for line in text.splitlines():
-        if _QUOTED_MARK.search(line.strip()):
-            continue
-        lines.append(line)
-    return "\n".join(lines)
+    # remove typical quoted reply lines in one pass (emptied lines are
+    # collapsed by the whitespace cleanup afterwards)
+    return _QUOTED_LINE.sub("", text)
 
 def clean_text(text: str) -> str:
     # main cleaner
     if not text:
         return ""
     t = _strip_html(text)
-    t = _drop_quoted_lines(t)
+    if _QUOTE_HINT.search(t):
+        t = _drop_quoted_lines(t)
     t = _BOILER.sub(" ", t)
-    t = _URL_OR_EMAIL.sub(" ", t)
-    t = re.sub(r"\s+", " ", t).strip().lower()
+    t = _NOISE_RUN.sub(" ", t).strip().lower()
     return t
+
+def clean_text_series(texts: pd.Series) -> pd.Series:
+    # vectorized clean_text for a column of strings; plain-text rows are
+    # cleaned with pandas string ops, rows with html go through clean_text
+    texts = texts.fillna("")
+    is_html = texts.str.contains(_HTML_HINT_PATTERN, regex=True)
+    cleaned = pd.Series("", index=texts.index, dtype=object)
+
+    plain = texts[~is_html]
+    cleaned[~is_html] = (
+        plain.str.replace(_QUOTED_LINE_PATTERN, " ", regex=True)
+        .str.replace(_BOILER_PATTERN, " ", regex=True, flags=re.IGNORECASE)
+        .str.replace(_NOISE_PATTERN, " ", regex=True, flags=re.IGNORECASE)
+        .str.strip()
+        .str.lower()
+    )
+    cleaned[is_html] = texts[is_html].map(clean_text)
+    return cleaned
\ No newline at end of file
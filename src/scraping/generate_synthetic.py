@@ -6,10 +6,11 @@ Generate Synthetic Emails:
     - insert into sqlite database with synthetic flag
 """
 
-import uuid
-import random
+import string
 import datetime
-from src.config.db_utils import insert_email
+import numpy as np
+from secrets import token_hex
+from src.config.db_utils import insert_emails
 
 # company and role pools
 companies = [
@@ -92,33 +93,71 @@ templates = [
     "Thank you for applying to {company}. Your application for {role} has been stored with confirmation code {rand_id}. {close}"
 ]
 
-def generate_email():
-    company = random.choice(companies)
-    role = random.choice(roles)
-    greet = random.choice(greetings)
-    close = random.choice(closings)
-    follow = random.choice(followups)
-    rand_id = str(random.randint(100000, 999999))
+def _make_formatter(template):
+    # split the template once into literal text and field names, so each
+    # email is a plain join instead of a fresh str.format parse
+    parts = list(string.Formatter().parse(template))
+
+    def fmt(**fields):
+        out = []
+        for literal, field_name, _, _ in parts:
+            out.append(literal)
+            if field_name is not None:
+                out.append(fields[field_name])
+        return "".join(out)
+
+    return fmt
+
+compiled_templates = [_make_formatter(t) for t in templates]
+
+subject_templates = [
+    "Application Confirmation – {company} {role}",
+    "Your application to {company} for {role}",
+    "{company} – {role} application received",
+    "Submission confirmed: {company} {role}"
+]
+compiled_subjects = [_make_formatter(t) for t in subject_templates]
+
+def generate_emails(n, rng=None):
+    # draw every random choice for all n emails as numpy index arrays,
+    # then assemble the rows in a single pass
+    rng = rng if rng is not None else np.random.default_rng()
+    company_idx = rng.integers(0, len(companies), n)
+    role_idx = rng.integers(0, len(roles), n)
+    greet_idx = rng.integers(0, len(greetings), n)
+    close_idx = rng.integers(0, len(closings), n)
+    follow_idx = rng.integers(0, len(followups), n)
+    template_idx = rng.integers(0, len(compiled_templates), n)
+    subject_idx = rng.integers(0, len(compiled_subjects), n)
+    rand_ids = np.char.mod("%d", rng.integers(100000, 1_000_000, n))
     today_date = datetime.date.today().strftime("%B %d, %Y")
-    template = random.choice(templates)
 
-    body = template.format(
+    return [
+        _build_email(
+            companies[c], roles[r], greetings[g], closings[cl], followups[f],
+            rand_id, today_date, compiled_templates[t], compiled_subjects[sj]
+        )
+        for c, r, g, cl, f, t, sj, rand_id in zip(
+            company_idx, role_idx, greet_idx, close_idx, follow_idx,
+            template_idx, subject_idx, rand_ids.tolist()
+        )
+    ]
+
+def generate_email():
+    return generate_emails(1)[0]
+
+def _build_email(company, role, greet, close, follow, rand_id, today_date, template, subject_template):
+    body = template(
         company=company, role=role,
         greet=greet, close=close, follow=follow,
         rand_id=rand_id, today_date=today_date
     ).strip()
 
-    subject_options = [
-        f"Application Confirmation – {company} {role}",
-        f"Your application to {company} for {role}",
-        f"{company} – {role} application received",
-        f"Submission confirmed: {company} {role}"
-    ]
-    subject = random.choice(subject_options)
+    subject = subject_template(company=company, role=role)
     sender = f"careers@{company.lower().replace(' ', '')}.com"
 
     return {
-        "id": f"synthetic_{uuid.uuid4().hex}",
+        "id": f"synthetic_{token_hex(16)}",
         "subject": subject,
         "sender": sender,
         "body": body,
@@ -128,9 +167,9 @@ def generate_email():
     }
 
 def main(n=600):
-    for _ in range(n):
-        email = generate_email()
-        insert_email(email)
+    # generate everything first, then insert in one executemany + commit
+    emails = generate_emails(n)
+    insert_emails(emails)
     print(f"Inserted {n} synthetic emails.")
 
 if __name__ == "__main__":
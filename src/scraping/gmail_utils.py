@@ -0,0 +1,153 @@
+"""
+Gmail Utils:
+    - connect to gmail api (one service per worker thread)
+    - list message ids a page at a time
+    - fetch messages through concurrent batch requests with retry
+    - parse messages into email rows
+"""
+
+import pybase64
+import time
+import functools
+import threading
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from google.oauth2.credentials import Credentials
+
+TOKEN_PATH = "src/config/gmail_token.json"
+GMAIL_PAGE_SIZE = 500  # ids per messages().list page (api max)
+GMAIL_BATCH_SIZE = 100  # max requests per gmail batch call
+GMAIL_MAX_WORKERS = 4  # gmail batch calls in flight at once
+GMAIL_MAX_RETRIES = 3  # backoff retries for rate limited / failed gets
+RETRY_STATUSES = {429, 500, 503}
+
+# list pages only need ids and the next token (skips threadId/resultSizeEstimate)
+LIST_FIELDS = "messages/id,nextPageToken"
+
+# full payloads, trimmed to the fields parse_message reads
+FULL_GET = {"format": "full", "fields": "id,labelIds,payload"}
+
+WANTED_HEADERS = frozenset(("subject", "from"))  # lowercased header names parse_message keeps
+
+_b64decode = pybase64.urlsafe_b64decode
+
+_thread_local = threading.local()
+
+@functools.lru_cache(maxsize=1)
+def _gmail_credentials():
+    # parse the token file once per process, shared by every worker's service
+    return Credentials.from_authorized_user_file(TOKEN_PATH)
+
+def get_gmail_service():
+    # connect to gmail api reusing the credentials loaded once per process
+    return build("gmail", "v1", credentials=_gmail_credentials())
+
+def get_body_from_payload(payload):
+    # walk MIME parts depth-first with an explicit stack, first text wins
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        data = (part.get("body") or {}).get("data")
+        if data:
+            text = _b64decode(data).decode("utf-8", errors="ignore")
+            if text:
+                return text
+            continue
+        # reversed so the first part is popped first
+        stack.extend(reversed(part.get("parts", [])))
+
+    return ""
+
+def _thread_gmail_service():
+    # httplib2 connections aren't thread-safe, so each worker thread gets its own service
+    service = getattr(_thread_local, "gmail_service", None)
+    if service is None:
+        service = _thread_local.gmail_service = get_gmail_service()
+    return service
+
+def _is_retryable(error):
+    return isinstance(error, HttpError) and error.resp.status in RETRY_STATUSES
+
+def list_page(page_token=None, **list_kwargs):
+    # one messages().list page, run on a worker so the next page can be prefetched
+    return _thread_gmail_service().users().messages().list(
+        userId="me", maxResults=GMAIL_PAGE_SIZE, pageToken=page_token,
+        fields=LIST_FIELDS, **list_kwargs
+    ).execute()
+
+def _execute_batch(ids, get_kwargs):
+    # one gmail batch round-trip, retrying ids that were rate limited (429)
+    # or hit server errors with exponential backoff, returns {id: message}
+    service = _thread_gmail_service()
+    found = {}
+    retry = []
+
+    def collect(request_id, response, exception):
+        if exception is None:
+            found[request_id] = response
+        elif _is_retryable(exception):
+            retry.append(request_id)
+        else:
+            print(f"Could not fetch message {request_id}: {exception}")
+
+    pending = list(ids)
+    for attempt in range(GMAIL_MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(2 ** (attempt - 1))
+        retry.clear()
+        batch = service.new_batch_http_request(callback=collect)
+        for msg_id in pending:
+            batch.add(
+                service.users().messages().get(userId="me", id=msg_id, **get_kwargs),
+                request_id=msg_id,
+            )
+        try:
+            batch.execute()
+        except HttpError as e:
+            if not _is_retryable(e):
+                raise
+            retry[:] = [msg_id for msg_id in pending if msg_id not in found]
+        if not retry:
+            return found
+        pending = list(retry)
+
+    print(f"Gave up on {len(pending)} messages after {GMAIL_MAX_RETRIES} retries")
+    return found
+
+def get_messages(executor, ids, **get_kwargs):
+    # split a page of ids into batches spread over the workers and fetch them
+    # concurrently, returns {id: message}
+    size = max(1, min(GMAIL_BATCH_SIZE, -(-len(ids) // GMAIL_MAX_WORKERS)))
+    chunks = [ids[i:i + size] for i in range(0, len(ids), size)]
+    found = {}
+    for chunk_found in executor.map(_execute_batch, chunks, [get_kwargs] * len(chunks)):
+        found.update(chunk_found)
+    return found
+
+def parse_message(msg, starred=False):
+    msg_id = msg["id"]
+    payload = msg["payload"]  # always present for format=full
+    headers = payload.get("headers", ())
+
+    # one pass over headers, first Subject/From wins (names are case-insensitive)
+    found = {}
+    for h in headers:
+        name = h["name"].lower()
+        if name in WANTED_HEADERS and name not in found:
+            found[name] = h["value"]
+            if len(found) == 2:
+                break
+    subject = found.get("subject", "")
+    sender = found.get("from", "")
+
+    # walk mime parts to find first text content
+    body = get_body_from_payload(payload)
+
+    return {
+        "id": msg_id,
+        "subject": subject,
+        "sender": sender,
+        "body": body,
+        "is_starred": starred,
+        "label": "Submitted" if starred else "Not Submitted"
+    }
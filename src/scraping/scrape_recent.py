@@ -6,83 +6,38 @@ Scrape Recent Emails:
     - insert unstarred emails
 """
 
-import base64
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-from src.config.db_utils import insert_email
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from src.config.db_utils import get_connection, insert_emails
+from src.scraping.gmail_utils import GMAIL_MAX_WORKERS, FULL_GET, list_page, get_messages, parse_message
 
-TOKEN_PATH = "src/config/gmail_token.json"
-
-def get_gmail_service():
-    # connect to gmail api using stored credentials
-    creds = Credentials.from_authorized_user_file(TOKEN_PATH)
-    service = build("gmail", "v1", credentials=creds)
-    return service
-
-def get_body_from_payload(payload):
-    # recursive function to walk through MIME parts
-    if "body" in payload and "data" in payload["body"] and payload["body"]["data"]:
-        data = payload["body"]["data"]
-        return base64.urlsafe_b64decode(data).decode("utf-8", errors="ignore")
-    
-    if "parts" in payload:
-        for part in payload["parts"]:
-            text = get_body_from_payload(part)
-            if text:
-                return text
-
-    return ""
-
-def parse_message(msg, starred=False):
-    msg_id = msg["id"]
-    payload = msg.get("payload", {})
-    headers = payload.get("headers", [])
-
-    subject = next((h["value"] for h in headers if h["name"] == "Subject"), "")
-    sender = next((h["value"] for h in headers if h["name"] == "From"), "")
-
-    # use recursive search to find first text content
-    body = get_body_from_payload(payload)
-
-    return {
-        "id": msg_id,
-        "subject": subject,
-        "sender": sender,
-        "body": body,
-        "is_starred": starred,
-        "label": "Submitted" if starred else "Not Submitted"
-    }
+UNSTARRED_QUERY = "-is:starred"  # starred emails are filtered out by the list query
 
 def scrape_recent():
     # fetch last ~800 emails and insert into database
-    service = get_gmail_service()
-    next_page_token = None
     fetched = 0
     limit = 800
 
-    while True and fetched < limit:
-        results = service.users().messages().list(
-            userId="me",
-            maxResults=10,
-            pageToken=next_page_token
-        ).execute()
-
-        messages = results.get("messages", [])
-        for m in messages:
-            if fetched >= limit:
-                break
-            msg = service.users().messages().get(userId="me", id=m["id"]).execute()
-
-            if "STARRED" in msg.get("labelIds", []):
-                continue
-            
-            email_data = parse_message(msg, starred=False)
-            insert_email(email_data)
-            fetched += 1
-        
-        next_page_token = results.get("nextPageToken")
-        if not next_page_token or fetched >= limit:
-            break
+    with ThreadPoolExecutor(max_workers=GMAIL_MAX_WORKERS) as executor, closing(get_connection()) as conn:
+        page = executor.submit(list_page, q=UNSTARRED_QUERY)
+        while page is not None:
+            results = page.result()
+
+            # starred emails never reach us, only fetch what the limit still allows
+            ids = [m["id"] for m in results.get("messages", [])][:limit - fetched]
+
+            # prefetch the next list page while this page's messages download
+            next_page_token = results.get("nextPageToken")
+            if next_page_token and fetched + len(ids) < limit:
+                page = executor.submit(list_page, next_page_token, q=UNSTARRED_QUERY)
+            else:
+                page = None
+
+            found = get_messages(executor, ids, **FULL_GET)
+            # one executemany transaction per page
+            rows = [parse_message(found[msg_id], starred=False) for msg_id in ids if msg_id in found]
+            insert_emails(rows, conn)
+            fetched += len(rows)
 
     print(f"Inserted {fetched} recent unstarred emails as Not Submited")
 
@@ -12,71 +12,103 @@ Train Model:
 import os
 import re
 import joblib
+import numpy as np
 import pandas as pd
-from collections import Counter
-from scipy.sparse import hstack
-from sklearn.feature_extraction.text import TfidfVectorizer
+import pyarrow.csv as pacsv
+from joblib import Parallel, delayed
+from scipy.sparse import hstack, vstack
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report
 
 DATA_DIR = "data"
 MODEL_DIR = "models"
+BODY_HASH_FEATURES = 2 ** 18  # hashed body n-gram columns
+HASH_CHUNK_SIZE = 2000  # texts per parallel hashing job
+USED_COLUMNS = ["sender", "subject", "processed_text", "label"]
+
+# everything after the last @ in a sender
+_SENDER_DOMAIN = re.compile(r"@([^@]*)$")
+
+def read_split(path):
+    # read one split with the multithreaded pyarrow reader, only the columns training uses;
+    # quoted fields may span lines (raw email bodies), which pandas' pyarrow engine can't parse
+    return pacsv.read_csv(
+        path,
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(include_columns=USED_COLUMNS),
+    ).to_pandas()
 
 def load_data():
     # read train/val/test splits
-    train = pd.read_csv(os.path.join(DATA_DIR, "train.csv"))
-    val = pd.read_csv(os.path.join(DATA_DIR, "val.csv"))
-    test = pd.read_csv(os.path.join(DATA_DIR, "test.csv"))
+    train, val, test = (
+        read_split(os.path.join(DATA_DIR, f"{name}.csv"))
+        for name in ("train", "val", "test")
+    )
     return train, val, test
 
-def extract_domain(sender):
-    # pull domain from email address
-    if not isinstance(sender, str) or "@" not in sender:
-        return "unknown"
-    dom = sender.split("@")[-1].lower()
-    # strip subdomains 
-    parts = dom.split(".")
-    return ".".join(parts[-2:]) if len(parts) >= 2 else dom
+def extract_domains(senders):
+    # pull domains from email addresses for a whole column at once,
+    # keeping the last two labels (strips subdomains), "unknown" without an @
+    dom = senders.str.extract(_SENDER_DOMAIN, expand=False).str.lower()
+    return dom.str.split(".", regex=False).str[-2:].str.join(".").fillna("unknown")
 
 def prepare_domains(train, val, test, top_k=50):
     # map sender -> domain
-    train["domain"] = train["sender"].apply(extract_domain)
-    val["domain"] = val["sender"].apply(extract_domain)
-    test["domain"] = test["sender"].apply(extract_domain)
+    train["domain"] = extract_domains(train["sender"])
+    val["domain"] = extract_domains(val["sender"])
+    test["domain"] = extract_domains(test["sender"])
 
-    # pick top-k frequent domains
-    counts = Counter(train["domain"])
-    top_domains = [d for d, _ in counts.most_common(top_k)]
+    # pick top-k frequent domains (stable sort keeps first-seen order on ties)
+    counts = train["domain"].value_counts(sort=False)
+    top_domains = counts.sort_values(ascending=False, kind="stable").head(top_k).index.tolist()
 
     # replace rare with "other"
-    def normalize_domain(d):
-        return d if d in top_domains else "other"
-    
-    train["domain_norm"] = train["domain"].apply(normalize_domain)
-    val["domain_norm"] = val["domain"].apply(normalize_domain)
-    test["domain_norm"] = test["domain"].apply(normalize_domain)
-
-    # one-hot encode
-    encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=True)
+    top_set = set(top_domains)
+    for df in (train, val, test):
+        df["domain_norm"] = np.where(df["domain"].isin(top_set), df["domain"], "other")
+
+    # one-hot encode, categories are already known so fit skips discovering them
+    categories = sorted(top_set | {"other"})
+    encoder = OneHotEncoder(
+        categories=[categories], handle_unknown="ignore", sparse_output=True, dtype=np.float32
+    )
     X_train = encoder.fit_transform(train[["domain_norm"]])
     X_val = encoder.transform(val[["domain_norm"]])
     X_test = encoder.transform(test[["domain_norm"]])
 
     return encoder, X_train, X_val, X_test
 
+def hash_parallel(hasher, texts, chunk_size=HASH_CHUNK_SIZE):
+    # hashing is stateless, so chunks of the corpus can be hashed in separate processes
+    texts = texts.tolist()
+    if len(texts) <= chunk_size:
+        return hasher.transform(texts)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    parts = Parallel(n_jobs=-1)(delayed(hasher.transform)(chunk) for chunk in chunks)
+    return vstack(parts, format="csr")
+
 def vectorize_text(train, val, test):
-    # tf-idf on subject
-    tfidf_subject = TfidfVectorizer(max_features=1000, ngram_range=(1,2))
+    # tf-idf on subject (float32 halves the feature matrix memory)
+    tfidf_subject = TfidfVectorizer(max_features=1000, ngram_range=(1,2), dtype=np.float32)
     X_train_sub = tfidf_subject.fit_transform(train["subject"].fillna(""))
     X_val_sub = tfidf_subject.transform(val["subject"].fillna(""))
     X_test_sub = tfidf_subject.transform(test["subject"].fillna(""))
 
-    # tf-idf on processed_text
-    tfidf_body = TfidfVectorizer(max_features=5000, ngram_range=(1,2))
-    X_train_body = tfidf_body.fit_transform(train["processed_text"].fillna(""))
-    X_val_body = tfidf_body.transform(val["processed_text"].fillna(""))
-    X_test_body = tfidf_body.transform(test["processed_text"].fillna(""))
+    # tf-idf on processed_text: stateless hashing (no vocabulary pass, chunks
+    # hash in parallel) then idf weighting; saved as one pipeline so
+    # prediction still just calls tfidf_body.transform
+    hasher = HashingVectorizer(
+        n_features=BODY_HASH_FEATURES, ngram_range=(1,2),
+        alternate_sign=False, norm=None, dtype=np.float32
+    )
+    idf = TfidfTransformer()
+    X_train_body = idf.fit_transform(hash_parallel(hasher, train["processed_text"].fillna("")))
+    X_val_body = idf.transform(hash_parallel(hasher, val["processed_text"].fillna("")))
+    X_test_body = idf.transform(hash_parallel(hasher, test["processed_text"].fillna("")))
+    tfidf_body = make_pipeline(hasher, idf)
     
     return tfidf_subject, tfidf_body, X_train_sub, X_val_sub, X_test_sub, X_train_body, X_val_body, X_test_body
 
@@ -85,8 +117,9 @@ def labels_to_binary(df):
     return (df["label"] == "Submitted").astype(int)
 
 def train_model(X_train, y_train):
-    # logistic regression with balanced class weights
-    clf = LogisticRegression(max_iter=1000, class_weight="balanced")
+    # logistic regression with balanced class weights, saga works on the
+    # float32 sparse features directly (lbfgs would copy them to float64)
+    clf = LogisticRegression(max_iter=1000, class_weight="balanced", solver="saga")
     clf.fit(X_train, y_train)
     return clf
 
@@ -96,11 +129,15 @@ def evaluate(model, X, y, split_name):
     print(classification_report(y, preds, target_names=["Not Submitted", "Submitted"]))
 
 def save_artifacts(model, tfidf_subject, tfidf_body, domain_encoder):
+    # compress=3 shrinks the pickled vocabularies (tfidf_subject keeps every
+    # pruned term in stop_words_); tfidf_body is left uncompressed because it is
+    # mostly a numpy idf array that predict memory-maps on load, and compressed
+    # files can't be memory-mapped
     os.makedirs(MODEL_DIR, exist_ok=True)
-    joblib.dump(model, os.path.join(MODEL_DIR, "log_reg.pkl"))
-    joblib.dump(tfidf_subject, os.path.join(MODEL_DIR, "tfidf_subject.pkl"))
+    joblib.dump(model, os.path.join(MODEL_DIR, "log_reg.pkl"), compress=3)
+    joblib.dump(tfidf_subject, os.path.join(MODEL_DIR, "tfidf_subject.pkl"), compress=3)
     joblib.dump(tfidf_body, os.path.join(MODEL_DIR, "tfidf_body.pkl"))
-    joblib.dump(domain_encoder, os.path.join(MODEL_DIR, "domain_encoder.pkl"))
+    joblib.dump(domain_encoder, os.path.join(MODEL_DIR, "domain_encoder.pkl"), compress=3)
     print("\n[INFO] saved model + vectorizers into models/")
 
 def main():
@@ -113,10 +150,10 @@ def main():
     # vectorize text
     tfidf_subject, tfidf_body, X_train_sub, X_val_sub, X_test_sub, X_train_body, X_val_body, X_test_body = vectorize_text(train, val, test)
 
-    # combine features
-    X_train = hstack([X_train_sub, X_train_body, X_train_dom])
-    X_val = hstack([X_val_sub, X_val_body, X_val_dom])
-    X_test = hstack([X_test_sub, X_test_body, X_test_dom])
+    # combine features straight into csr (the solver's format, skips the coo intermediate)
+    X_train = hstack([X_train_sub, X_train_body, X_train_dom], format="csr")
+    X_val = hstack([X_val_sub, X_val_body, X_val_dom], format="csr")
+    X_test = hstack([X_test_sub, X_test_body, X_test_dom], format="csr")
 
     # labels
     y_train = labels_to_binary(train)
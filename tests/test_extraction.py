@@ -0,0 +1,140 @@
+"""
+Regex extraction regression:
+    - company / position / portal url must match the original per-pattern scan
+    - realistic confirmation emails plus a random-text fuzz
+"""
+
+import random
+import re
+
+import pytest
+
+from src.ai_extraction import extract_info
+
+# reference copy of the original extractor (each pattern scanned with findall, in order)
+_REF_COMPANY = [re.compile(p, re.IGNORECASE) for p in (
+    r"(?:thank you for applying to|your application (?:to|at))\s+([a-z][a-z\s&.-]+?)(?:\s+for|\.|$)",
+    r"(?:at|from|with)\s+([a-z][a-z\s&.-]+?)(?:\s+for|\s+–|\s+-|\s+\||\.|\s+application|$)",
+    r"([a-z][a-z\s&.-]{2,25})\s+(?:application|internship|position|careers|team)",
+    r"application confirmation\s+[–-]\s+([a-z][a-z\s&.-]+)",
+    r"welcome to\s+([a-z][a-z\s&.-]+?)(?:\s|$)",
+    r"([a-z][a-z\s&.-]{3,30})\s+talent\s+team",
+    r"this is to confirm your application to\s+([a-z][a-z\s&.-]+)",
+)]
+
+_REF_POSITION = [re.compile(p, re.IGNORECASE) for p in (
+    r"(?:for the|for our|for a)\s+([a-z][a-z\s-]{5,40}?)(?:\s+position|\s+role|\s+internship|\.|$)",
+    r"([a-z][a-z\s-]+?)\s+(?:internship|intern)\s+(?:position|role|application)",
+    r"(?:position:|role:|applied for:)\s+([a-z][a-z\s-]+?)(?:\.|$|internship)",
+    r"application for\s+([a-z][a-z\s-]+?)(?:\s+at|\s+with|\.|$)",
+    r"([a-z\s-]+?)\s+(?:summer|fall|spring|winter)\s+(?:intern|internship)",
+    r"(?:software|data|marketing|finance|engineering|product|design)\s+([a-z][a-z\s-]*?)\s+intern",
+    r"intern[:\s-]+([a-z][a-z\s-]+?)(?:\.|$|at)",
+)]
+
+_REF_URL = [re.compile(p, re.IGNORECASE) for p in (
+    r"https?://\S+(?:candidate|portal|application|status|track|hiring|careers|recruit)\S*",
+    r"https?://\S*(?:workday|greenhouse|lever|bamboohr|smartrecruiters)\S*",
+    r"https?://\S*(?:apply|jobs|careers)\S*portal\S*",
+    r"https?://\S*status\S*application\S*",
+)]
+
+
+def _ref_field(patterns, text, excluded):
+    for pattern in patterns:
+        for match in pattern.findall(text):
+            candidate = re.sub(r"[.,-]+$", "", match.strip()).title()
+            if len(candidate) > 3 and candidate.lower() not in excluded:
+                return candidate
+    return ""
+
+
+def _ref_url(body):
+    for pattern in _REF_URL:
+        for match in pattern.findall(body):
+            url = re.sub(r"[.,;:!?)]+$", "", match)
+            if len(url) > 10:
+                return url
+    for url in re.findall(r"https?://\S+", body):
+        url = re.sub(r"[.,;:!?)]+$", "", url)
+        if any(k in url.lower() for k in
+               ["candidate", "portal", "status", "application", "track", "hiring", "apply"]):
+            return url
+    return ""
+
+
+def _reference(subject, body):
+    full_text = f"{subject} {body}".lower()
+    return (
+        _ref_field(_REF_COMPANY, full_text,
+                   ["the", "and", "for", "with", "this", "your", "our", "team", "application"]),
+        _ref_field(_REF_POSITION, full_text, ["the", "and", "for", "with", "this", "your", "our"]),
+        _ref_url(body),
+    )
+
+
+def _current(subject, body):
+    # empty sender so company comes from the text patterns, not the domain
+    result = extract_info.extract_with_regex(subject, body, "")
+    return result["company"], result["position"], result["candidate_portal_url"]
+
+
+REALISTIC = [
+    ("We received your application for the Software Engineering Intern position",
+     "Thank you for applying to Stripe. Our team will review your application. "
+     "Track it at https://stripe.greenhouse.io/candidate/status."),
+    ("Meta - Data Science Intern application received",
+     "Hi Harrison, thanks for your interest in the Data Science Intern role at Meta."),
+    ("Application Confirmation – Amazon Machine Learning Intern",
+     "Your application to Amazon for Machine Learning Intern was submitted. "
+     "Check https://amazon.jobs/en/portal/applications for updates."),
+    ("Your application at Airbnb",
+     "Welcome to Airbnb Careers. Position: Quantitative Analyst. Summer Intern program 2026."),
+    ("Thanks from the Lyft Talent Team",
+     "This is to confirm your application to Lyft for Product Management Intern role."),
+]
+
+
+@pytest.mark.parametrize("subject,body", REALISTIC)
+def test_realistic_emails_match_reference(subject, body):
+    assert _current(subject, body) == _reference(subject, body)
+
+
+def test_fuzzed_text_matches_reference():
+    rng = random.Random(0)
+    words = [
+        "for the", "for our", "at", "from", "with", "intern", "internship", "position", "role",
+        "application", "application for", "summer", "fall", "software", "data", "engineering",
+        "welcome to", "talent team", "position:", "thank you for applying to", "your application to",
+        "meta", "google", "analyst", "team", "careers", ".", "-", "–", "|",
+        "https://x.workday.com/status", "https://jobs.example.com/apply/portal/1",
+        "https://example.com/track.", "https://a.io/status?application=1)",
+    ]
+    for _ in range(2000):
+        subject = " ".join(rng.choice(words) for _ in range(rng.randint(0, 8)))
+        body = " ".join(rng.choice(words) for _ in range(rng.randint(0, 25)))
+        assert _current(subject, body) == _reference(subject, body), (subject, body)
+
+
+FAST_SUBJECT = "Your application for the Software Engineering Intern position"
+FAST_BODY = "Thanks for applying, we will be in touch."
+
+
+@pytest.mark.parametrize("sender", [
+    "notifications@app.ashbyhq.com",
+    "donotreply@talent.icims.com",
+    "workday@wd5.myworkdaysite.com",
+    "Stripe <jobs@mail.stripe.com>",
+    "Recruiting <careers@gmail.com>",
+    "not an address",
+])
+def test_fast_path_skips_ats_and_subdomain_senders(sender):
+    assert extract_info._regex_fast_path(FAST_SUBJECT, FAST_BODY, sender) is None
+
+
+@pytest.mark.parametrize("sender", ["careers@stripe.com", "Stripe <careers@stripe.com>"])
+def test_fast_path_uses_corporate_sender_domain(sender):
+    result = extract_info._regex_fast_path(FAST_SUBJECT, FAST_BODY, sender)
+    assert result["company"] == "Stripe"
+    assert result["position"]
+    assert result["extraction_method"] == "regex-fast"
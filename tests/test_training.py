@@ -0,0 +1,29 @@
+"""
+Training data loading:
+    - split csvs written by build_dataset read back intact, even with multi-line bodies
+"""
+
+import pandas as pd
+
+from src.preprocessing import build_dataset
+from src.training import train
+
+
+def test_split_csvs_round_trip_multiline_bodies(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_dataset, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(train, "DATA_DIR", str(tmp_path))
+    df = pd.DataFrame({
+        "id": [str(i) for i in range(40)],
+        "subject": [f"Application {i}" for i in range(40)],
+        "sender": [f"Careers <jobs@company{i}.com>" for i in range(40)],
+        # long multi-line bodies so each csv spans several of pyarrow's 1MB read blocks
+        "body": [f"Hi,\n\nThanks for applying, \"team {i}\".\r\nBest,\nRecruiting\n" * 2000 for i in range(40)],
+        "label": ["Submitted", "Not Submitted"] * 20,
+        "processed_text": [f"thanks applying team {i}" for i in range(40)],
+    })
+    build_dataset.split_and_save(df)
+
+    loaded = pd.concat(train.load_data()).sort_values("subject").reset_index(drop=True)
+    expected = df[train.USED_COLUMNS].sort_values("subject").reset_index(drop=True)
+    assert list(loaded.columns) == train.USED_COLUMNS
+    pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)